@@ -1,5 +1,5 @@
 import numpy as np
-import scipy.stats as st
+from bootstrap import bootstrap
 
 # --- Sample Data (mtcars data for simplicity) ---
 data = np.array([21.0, 21.0, 22.8, 21.4, 18.7, 18.1, 14.3, 24.4, 22.8, 19.2, 
@@ -8,42 +8,39 @@ data = np.array([21.0, 21.0, 22.8, 21.4, 18.7, 18.1, 14.3, 24.4, 22.8, 19.2,
                  15.0, 21.4])
 N = len(data)
 
-# --- Statistic Function ---
-# Calculate the median of the data (or any other statistic like R-squared)
-def calculate_statistic(sample):
-    return np.median(sample)
+# --- Statistic ---
+# The median of the data (or any other statistic like R-squared).
+# "median" is evaluated for a whole block of resamples at once with np.partition;
+# bootstrap() also accepts an arbitrary Python function as the statistic.
+statistic = "median"
 
-# 1. Calculate the Observed Statistic
-obs_stat = calculate_statistic(data)
-
-# 2. Perform Bootstrap Resampling
+# 1. + 2. Observed Statistic and Bootstrap Resampling
 B = 1000 # Number of bootstrap replicates
-bootstrap_stats = np.empty(B)
-
-np.random.seed(42)
+confidence_level = 0.95
 
-for i in range(B):
-    # Resample with replacement from the original data
-    bootstrap_sample = np.random.choice(data, size=N, replace=True)
-    bootstrap_stats[i] = calculate_statistic(bootstrap_sample)
+# Resample with replacement from the original data, as a (B, N) index matrix.
+# ci_method="bca" gives the Bias-Corrected and Accelerated interval; it only adds
+# the jackknife values on top of the replicates.
+result = bootstrap(data, statistic, B=B, confidence_level=confidence_level,
+                   ci_method="bca", rng=42)
 
-# 3. Calculate Confidence Interval (Percentile Method)
-confidence_level = 0.95
-lower_percentile = (1 - confidence_level) / 2 * 100
-upper_percentile = (1 + confidence_level) / 2 * 100
+obs_stat = result.statistic
+bootstrap_stats = result.bootstrap_distribution
 
-ci_percentile = np.percentile(bootstrap_stats, [lower_percentile, upper_percentile])
+# 3. Confidence Intervals (BCa and, from the same replicates, Percentile)
+ci_bca = np.array(result.confidence_interval)
+ci_percentile = np.array(result.percentile_interval(confidence_level))
 
-# 4. Calculate Bias and Standard Error
-bias = np.mean(bootstrap_stats) - obs_stat
-std_error = np.std(bootstrap_stats, ddof=1)
+# 4. Bias and Standard Error
+bias = result.bias
+std_error = result.standard_error
 
 print(f"Observed Statistic (Median): {obs_stat:.4f}")
 print("--- Bootstrap Statistics ---")
 print(f"Bias: {bias:.4f}")
 print(f"Standard Error: {std_error:.4f}")
 print(f"{confidence_level*100:.0f}% Percentile CI: {ci_percentile}")
+print(f"{confidence_level*100:.0f}% BCa CI: {ci_bca}")
 
-# Note: The 'bca' method shown in the R examples (Bias-Corrected and Accelerated) 
-# is more complex and typically requires specialized libraries like `arch` or `scikits-bootstrap` 
-# in Python, but the percentile method provides the fundamental CI concept.
\ No newline at end of file
+# Note: The BCa acceleration constant comes from the jackknife, which for the
+# median is computed from a single sort of the data rather than N refits.
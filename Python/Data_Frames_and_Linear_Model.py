@@ -2,18 +2,23 @@ import pandas as pd
 import numpy as np
 import statsmodels.api as sm
 from statsmodels.formula.api import ols
+from alias_sampler import AliasSampler
 
 # --- 1. Data Loading/Preparation (Simulated birthwt data) ---
 # The original 'birthwt' data has 189 rows. We create a simulated, 
 # but structurally similar, dataset based on the R summary provided.
 
+# Categorical columns are drawn from alias tables, built once per distribution
+race_table = AliasSampler([0.5, 0.2, 0.3], values=[1, 2, 3])
+smoke_table = AliasSampler([0.6, 0.4], values=[0, 1])
+
 # Data structure based on summary(birthwt) and help(birthwt) 
 data = {
     'low': np.random.randint(0, 2, 189), # low birth weight (0/1)
     'age': np.random.randint(14, 46, 189), # mother's age
     'lwt': np.random.randint(80, 251, 189), # mother's weight (lbs)
-    'race': np.random.choice([1, 2, 3], 189, p=[0.5, 0.2, 0.3]), # race (1, 2, 3)
-    'smoke': np.random.choice([0, 1], 189, p=[0.6, 0.4]), # smoke during pregnancy (0/1)
+    'race': race_table.sample(189), # race (1, 2, 3)
+    'smoke': smoke_table.sample(189), # smoke during pregnancy (0/1)
     'bwt': np.random.randint(709, 4991, 189), # birth weight (grams)
 }
 # We manually inject the outlier for replication purposes:
@@ -1,6 +1,7 @@
 import numpy as np
 from density_simulation import generate_faithful_mock_data
 from naive_estimator_python import kernel_density_estimate # Reuse the generic KDE function
+from kde import OnlineKDE, gaussian_kernel # K(t) = 1/sqrt(2*pi) * exp(-t^2/2), the N(0, 1) PDF
 
 # --- Data Setup ---
 eruption_data = generate_faithful_mock_data(n=200)
@@ -8,14 +9,6 @@ n = len(eruption_data)
 h_kde = 0.1 # Smaller bandwidth for smoother estimate
 x_range = np.arange(0.0, 6.02, 0.02) # Evaluation points (x)
 
-# --- 1. Gaussian Kernel ---
-def gaussian_kernel(t: float) -> float:
-    """
-    K(t) = 1/sqrt(2*pi) * exp(-t^2/2)
-    This is the PDF of the standard normal distribution N(0, 1).
-    """
-    return np.exp(-0.5 * t**2) / np.sqrt(2 * np.pi)
-
 # --- Execution ---
 fhat_gaussian = kernel_density_estimate(eruption_data, x_range, h_kde, gaussian_kernel)
 
@@ -26,4 +19,17 @@ print("-" * 25)
 
 # Display a few key points
 for i in range(0, len(x_range), 50):
-    print(f"{x_range[i]:<10.2f} | {fhat_gaussian[i]:<10.4f}")
\ No newline at end of file
+    print(f"{x_range[i]:<10.2f} | {fhat_gaussian[i]:<10.4f}")
+
+# --- Streaming updates ---
+# OnlineKDE keeps grid counts and absorbs new observations in O(1) each; the
+# convolution is only redone when the density is queried after new data.
+# With window=150 only the most recent 150 observations count, so older ones
+# are removed from the grid as new ones arrive.
+online = OnlineKDE(lo=0.0, hi=8.0, h=h_kde, window=150)
+online.add_batch(eruption_data)  # 200 observations: the first 50 already drop out
+print(f"\nOnline KDE over the last {online.n:.0f} observations, f(2.0) = {online(2.0):.4f}")
+# A burst of mostly short eruptions pushes out 50 more of the old observations.
+for x_new in generate_faithful_mock_data(n=50, p_short=0.9):
+    online.add(x_new)
+print(f"After 50 new (90% short) observations, f(2.0) = {online(2.0):.4f}")
@@ -1,5 +1,6 @@
 import numpy as np
 from density_simulation import generate_faithful_mock_data
+from histogram_density import BinPyramid, HistogramAccumulator
 
 # --- Data Setup ---
 eruption_data = generate_faithful_mock_data(n=200)
@@ -10,16 +11,16 @@ h = 0.5 # Bin width
 # 1. Define breaks (bins)
 my_breaks = np.arange(x0, x1 + h, h)
 
-# 2. Use numpy.histogram to count frequencies and calculate density
-# density=True normalizes the counts so the area sums to 1.
-counts, bin_edges = np.histogram(
-    eruption_data, 
-    bins=my_breaks, 
-    density=True
-)
+# 2. Count frequencies chunk by chunk and calculate density
+# The accumulator only keeps the bin counts, so the same code works on data
+# streamed from a file (see histogram_density_file); density() normalizes
+# the counts so the area sums to 1, exactly like np.histogram(density=True).
+hist = HistogramAccumulator(my_breaks)
+for chunk in np.array_split(eruption_data, 4):
+    hist.add(chunk)
 
 # Bin mids are (edge[i] + edge[i+1]) / 2
-mids = (bin_edges[:-1] + bin_edges[1:]) / 2
+counts, mids, bin_edges = hist.density()
 
 print(f"--- Histogram Density Estimate (Bin Width h={h}) ---")
 print("This gives a piecewise-constant estimate of the density.")
@@ -29,4 +30,16 @@ print("-" * 45)
 for m, d, e_start, e_end in zip(mids, counts, bin_edges[:-1], bin_edges[1:]):
     print(f"{m:<10.2f} | {d:<10.4f} | [{e_start:.1f}, {e_end:.1f})")
 
-# The density is constant (d) within each bin [e_start, e_end).
\ No newline at end of file
+# The density is constant (d) within each bin [e_start, e_end).
+
+# --- Sweeping bin widths without rescanning ---
+# Count once on a fine base grid (width 8 / 1024); every width that is a
+# multiple of the base width, any origin on the base grid, and averaged
+# shifted histograms are then built from the base counts in O(bins).
+pyramid = BinPyramid.from_data(eruption_data, x0, x1, base_bins=1024)
+for width in (0.25, 0.5, 1.0):
+    dens, _, edges = pyramid.histogram(width, x0=x0 - width / 2)
+    print(f"h={width:<5} shifted origin {edges[0]:6.3f}: {len(dens)} bins, max density {dens.max():.4f}")
+
+ash_density, ash_mids = pyramid.ash(h, m=8)
+print(f"ASH (h={h}, m=8): {len(ash_mids)} points, mode near x={ash_mids[np.argmax(ash_density)]:.2f}")
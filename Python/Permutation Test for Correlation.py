@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from permutation import correlation_permutation_test
 
 # --- Original Data (SAT-type Score vs. SAT Score) ---
 Score = np.array([58, 48, 48, 41, 34, 43, 38, 53, 41, 60, 55, 44,  
@@ -16,21 +17,17 @@ print(f"Observed Correlation (r): {r_obt:.6f}")
 
 # 2. Perform Permutation Resampling
 B = 10000 
-r_random = np.empty(B)
 
 # The core idea: under H0 (no correlation), any pairing of Score and SAT is equally likely.
-# We fix one variable (e.g., Score) and randomly shuffle the other (SAT).
-for i in range(B):
-    # Randomly shuffle (permute) the SAT scores
-    X_permuted = np.random.permutation(SAT)
-    Y = Score # Keep Score fixed
-    
-    # Calculate the correlation for the permuted data
-    r_random[i] = np.corrcoef(Y, X_permuted)[0, 1]
+# We fix one variable (Score) and randomly shuffle the other (SAT). Means and variances
+# do not change under shuffling, so both are standardized once and r for a whole
+# block of shuffles is a single matrix product.
+result = correlation_permutation_test(Score, SAT, B=B)
+r_random = result.null_distribution
 
 # 3. Calculate the P-value (One-sided: P(Stat_random >= Stat_observed))
 # Testing for a positive correlation (r > 0)
-pvalue = np.mean(np.concatenate(([r_obt], r_random)) >= r_obt)
+pvalue = result.pvalue
 
 print(f"Permutation P-value (B={B}): {pvalue:.6f}")
 
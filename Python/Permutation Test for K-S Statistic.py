@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import ks_2samp # Two-sample K-S test
+from permutation import permutation_test
 
 # --- Data Re-use (chickwts: soybean vs. linseed) ---
 X = np.array([219, 271, 258, 248, 240, 246, 254, 301, 280, 236, 234, 309, 253, 303]) # Soybean (n=14)
@@ -16,26 +17,15 @@ D_obs = ks_2samp(X, Y).statistic
 print(f"Observed K-S Statistic (D): {D_obs:.4f}")
 
 # 2. Perform Permutation Resampling
+# Z is sorted once; each relabeling is a label vector over the sorted order and
+# D is read off the cumulative label sums, a whole chunk of relabelings at a time.
 B = 10000 
-D_stats = np.empty(B)
-
-for i in range(B):
-    # Randomly choose n1 indices for the new 'X' group
-    k = np.random.choice(N, size=n1, replace=False)
-    
-    x1 = Z[k]
-    
-    # The remaining indices form the new 'Y' group
-    y1_mask = np.ones(N, dtype=bool)
-    y1_mask[k] = False
-    y1 = Z[y1_mask]
-    
-    # Calculate the K-S statistic for the permuted data
-    D_stats[i] = ks_2samp(x1, y1).statistic
+result = permutation_test(X, Y, statistic="ks", B=B, method="monte-carlo")
+D_stats = result.null_distribution
 
 # 3. Calculate the P-value (One-sided: P(Stat_random >= Stat_observed))
 # Large values of D support the alternative (different distributions)
-pvalue = np.mean(np.concatenate(([D_obs], D_stats)) >= D_obs)
+pvalue = result.pvalue
 
 print(f"Permutation P-value (B={B}): {pvalue:.6f}")
 
@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind
+from permutation import permutation_test
 
 # --- Original Data (DRP Scores) ---
 T = np.array([24, 43, 58, 71, 61, 44, 67, 49, 59, 52, 62, 54, 46, 43, 57, 
@@ -12,31 +12,19 @@ n2 = len(C)
 Z = np.concatenate((T, C)) # Pooled data
 N = len(Z)
 
-# 1. Calculate the Observed Statistic
-obs_stat = np.mean(T) - np.mean(C)
-print(f"Observed Difference in Means: {obs_stat:.4f}")
-
-# 2. Perform Permutation Resampling
-B = 10000 # Increased B for better P-value estimation
-new_stats = np.empty(B)
-
+# 1. + 2. Observed Statistic and Permutation Resampling
 # The core idea: under H0 (no difference), the group labels are interchangeable.
-for i in range(B):
-    # Randomly choose n1 indices for the new 'Treatment' group
-    idx = np.random.choice(N, size=n1, replace=False)
-    
-    newT = Z[idx]
-    # The remaining indices form the new 'Control' group
-    # Note: np.delete is clean but can be slow; list comprehension is an alternative
-    newC_mask = np.ones(N, dtype=bool)
-    newC_mask[idx] = False
-    newC = Z[newC_mask]
-    
-    new_stats[i] = np.mean(newT) - np.mean(newC)
+# permutation_test draws the relabelings in chunks of label vectors and gets the
+# group sums for a whole chunk with one matrix product against Z.
+B = 10000 # Increased B for better P-value estimation
+result = permutation_test(T, C, B=B)
+obs_stat = result.statistic
+new_stats = result.null_distribution
+print(f"Observed Difference in Means: {obs_stat:.4f}")
 
-# 3. Calculate the P-value (One-sided: P(Stat_random >= Stat_observed))
-# Include the observed statistic in the null distribution for a common definition
-pvalue = np.mean(np.concatenate(([obs_stat], new_stats)) >= obs_stat)
+# 3. P-value (One-sided: P(Stat_random >= Stat_observed))
+# The observed statistic is included in the null distribution for a common definition
+pvalue = result.pvalue
 
 print(f"Permutation P-value (B={B}): {pvalue:.6f}")
 
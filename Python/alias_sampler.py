@@ -0,0 +1,75 @@
+import numpy as np
+
+# --- Walker/Vose alias method for categorical sampling ---
+# np.random.choice(values, size, p=prob) validates p and builds a CDF on every
+# call, then binary-searches it per draw. An alias table is built once per
+# distribution in O(k); after that each draw is one uniform column index plus
+# one coin flip against that column's acceptance probability, i.e. O(1) per
+# sample and fully vectorized over a batch.
+
+
+class AliasSampler:
+    """
+    Categorical sampler over `values` (default 0..k-1) with probabilities
+    proportional to `weights`.
+
+    Build it once and call sample() as often as needed. update() changes
+    single weights; the table is rebuilt lazily on the next draw, so any
+    number of updates between batches costs one O(k) rebuild.
+    """
+
+    def __init__(self, weights, values=None):
+        weights = np.array(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError("weights must be a non-empty 1-D array")
+        if np.any(weights < 0) or not np.isfinite(weights).all() or weights.sum() <= 0:
+            raise ValueError("weights must be finite, non-negative and not all zero")
+        self.weights = weights
+        self.values = None if values is None else np.asarray(values)
+        if self.values is not None and len(self.values) != len(weights):
+            raise ValueError("values and weights must have the same length")
+        self._build()
+
+    def _build(self):
+        """Vose's construction: pair each under-full column with an over-full one."""
+        k = len(self.weights)
+        scaled = self.weights * (k / self.weights.sum())
+        accept = np.ones(k)
+        alias = np.arange(k)
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large[-1]
+            accept[s] = scaled[s]
+            alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            if scaled[g] < 1.0:
+                small.append(large.pop())
+        # Whatever is left is full up to rounding error.
+        self._accept = accept
+        self._alias = alias
+        self._dirty = False
+
+    @property
+    def probabilities(self) -> np.ndarray:
+        return self.weights / self.weights.sum()
+
+    def update(self, index: int, weight: float):
+        """Sets the (unnormalised) weight of one category."""
+        if weight < 0 or not np.isfinite(weight):
+            raise ValueError("weight must be finite and non-negative")
+        if self.weights.sum() - self.weights[index] + weight <= 0:
+            raise ValueError("weights must not all be zero")
+        self.weights[index] = weight
+        self._dirty = True
+
+    def sample(self, size, rng=None) -> np.ndarray:
+        """Draws `size` (int or shape) outcomes; O(1) work per draw."""
+        if self._dirty:
+            self._build()
+        rng = np.random.default_rng(rng)
+        column = rng.integers(0, len(self.weights), size=size)
+        keep = rng.random(size=size) < self._accept[column]
+        idx = np.where(keep, column, self._alias[column])
+        return idx if self.values is None else self.values[idx]
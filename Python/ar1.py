@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.signal import lfilter
+
+# --- Block generation of AR(1) chains ---
+# X_i = rho * X_{i-1} + eps_i is a first-order recursive linear filter of the
+# innovations, so a block of r steps is one vector of r normals passed through
+# scipy.signal.lfilter. The filter state carried between blocks is
+# rho * X_last, which makes the chain continue exactly where the previous
+# block ended.
+
+
+class AR1Chain:
+    """
+    AR(1) chain X_i = rho * X_{i-1} + eps_i, eps_i ~ N(0, tau^2), stored in a
+    preallocated float64 buffer that doubles in size when full.
+    """
+
+    def __init__(self, rho: float, tau: float, initial: float = 0.0, rng=None,
+                 capacity: int = 1 << 16, block_size: int = 1 << 20):
+        if tau <= 0:
+            raise ValueError("tau must be positive")
+        self.rho = rho
+        self.tau = tau
+        self.initial = float(initial)
+        self.rng = np.random.default_rng(rng)
+        self.block_size = block_size
+        self._buffer = np.empty(max(capacity, 1))
+        self.n = 0
+
+    @property
+    def state(self) -> float:
+        """The last value of the chain (the starting value while it is empty)."""
+        return float(self._buffer[self.n - 1]) if self.n else self.initial
+
+    @property
+    def chain(self) -> np.ndarray:
+        """View of the n values generated so far."""
+        return self._buffer[:self.n]
+
+    def _reserve(self, size: int):
+        if size > len(self._buffer):
+            grown = np.empty(max(size, 2 * len(self._buffer)))
+            grown[:self.n] = self._buffer[:self.n]
+            self._buffer = grown
+
+    def extend(self, r: int) -> np.ndarray:
+        """Generates r more steps and returns a view of them."""
+        self._reserve(self.n + r)
+        start = self.n
+        a = [1.0, -self.rho]
+        for offset in range(0, r, self.block_size):
+            b = min(self.block_size, r - offset)
+            eps = self.rng.normal(0.0, self.tau, size=b)
+            zi = [self.rho * self.state]
+            self._buffer[self.n:self.n + b] = lfilter([1.0], a, eps, zi=zi)[0]
+            self.n += b
+        return self._buffer[start:self.n]
+
+
+def ar1_blocks(rho: float, tau: float, block_size: int, initial: float = 0.0, rng=None):
+    """
+    Endless generator of consecutive AR(1) blocks of `block_size` steps that
+    keeps only the last value between blocks (O(block_size) memory however
+    long the run), for consumers such as streaming stopping rules. Same
+    chain as AR1Chain(rho, tau, initial, rng).extend(block_size) repeated.
+    """
+    if tau <= 0:
+        raise ValueError("tau must be positive")
+    rng = np.random.default_rng(rng)
+    eps = np.empty(block_size)  # innovation buffer, reused for every block
+    a = [1.0, -rho]
+    state = float(initial)
+    while True:
+        rng.standard_normal(out=eps)
+        eps *= tau
+        block, _ = lfilter([1.0], a, eps, zi=[rho * state])
+        state = float(block[-1])
+        yield block
@@ -0,0 +1,173 @@
+import os
+import pickle
+import numpy as np
+from typing import Tuple
+
+# --- Out-of-core chain storage with checkpoint / resume ---
+# Draws are appended to a raw float64 file, draw-major ((draws, chains), so an
+# append is one contiguous write), through a memory map that is extended a
+# fixed-size block at a time. A checkpoint is a pickle of the number of draws
+# written plus any sampler and monitor state. It is written to a temporary
+# file and renamed into place after the draws are flushed, so the last
+# checkpoint always describes draws that are safely on disk. Draws written
+# after it are ignored and overwritten on resume.
+
+
+class ChainStore:
+    """
+    Append-only store for K chains kept in `<path>.draws`, with checkpoints
+    in `<path>.ckpt`. Use ChainStore.create() for a new run and
+    ChainStore.open() to resume from the last checkpoint.
+    """
+
+    def __init__(self, path: str, n_chains: int, block_size: int, n_draws: int = 0, state=None):
+        self.path = path
+        self.n_chains = n_chains
+        self.block_size = block_size
+        self.n_draws = n_draws
+        self.state = state
+        self._capacity = 0
+        self._map = None
+
+    @property
+    def draws_path(self) -> str:
+        return self.path + ".draws"
+
+    @property
+    def checkpoint_path(self) -> str:
+        return self.path + ".ckpt"
+
+    @classmethod
+    def create(cls, path: str, n_chains: int, block_size: int = 1 << 16) -> "ChainStore":
+        """Starts an empty store, replacing any previous run at `path`."""
+        store = cls(path, n_chains, block_size)
+        open(store.draws_path, "wb").close()
+        store.checkpoint()
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "ChainStore":
+        """Reopens a store at its last checkpoint; `state` holds what was saved with it."""
+        with open(path + ".ckpt", "rb") as f:
+            saved = pickle.load(f)
+        return cls(path, saved["n_chains"], saved["block_size"], saved["n_draws"], saved["state"])
+
+    def _reserve(self, n_draws: int):
+        if n_draws <= self._capacity:
+            return
+        # Grow the file by whole blocks and remap it.
+        blocks = -(-n_draws // self.block_size)
+        self._capacity = blocks * self.block_size
+        row = self.n_chains * np.dtype(np.float64).itemsize
+        if os.path.getsize(self.draws_path) < self._capacity * row:
+            with open(self.draws_path, "r+b") as f:
+                f.truncate(self._capacity * row)
+        if self._map is not None:
+            self._map.flush()
+        self._map = np.memmap(self.draws_path, dtype=np.float64, mode="r+",
+                              shape=(self._capacity, self.n_chains))
+
+    def append(self, block):
+        """Appends a (K, b) block of draws, one row per chain."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[0] != self.n_chains:
+            raise ValueError(f"expected a ({self.n_chains}, b) block of draws")
+        b = block.shape[1]
+        self._reserve(self.n_draws + b)
+        self._map[self.n_draws:self.n_draws + b] = block.T
+        self.n_draws += b
+
+    def checkpoint(self, state=None):
+        """Flushes the draws, then atomically records n_draws and `state`."""
+        if self._map is not None:
+            self._map.flush()
+        self.state = state
+        saved = {"n_chains": self.n_chains, "block_size": self.block_size,
+                 "n_draws": self.n_draws, "state": state}
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def draws(self) -> np.ndarray:
+        """Read-only (K, n_draws) view of the stored chains (memory-mapped, strided)."""
+        if self.n_draws == 0:
+            return np.empty((self.n_chains, 0))
+        if self._map is not None:
+            self._map.flush()
+        data = np.memmap(self.draws_path, dtype=np.float64, mode="r",
+                         shape=(self.n_draws, self.n_chains))
+        return data.T
+
+
+def sample_to_store(sampler, path: str, n_draws: int, block_size: int = 1 << 16,
+                    checkpoint_every: int = 16, monitor=None,
+                    resume: bool = True) -> Tuple[ChainStore, object]:
+    """
+    Runs `sampler` (anything with sample(n) -> (K, n), get_state() and
+    set_state(), e.g. mcmc.MetropolisHastings) until `n_draws` draws per
+    chain are stored at `path`, checkpointing every `checkpoint_every`
+    blocks. `monitor`, if given, is a sequence of K per-chain accumulators,
+    e.g. [BatchMeans() for _ in range(K)]: monitor[k].update() receives the
+    (b,) draws of chain k from every block, so chains are never mixed. The
+    monitors are saved with each checkpoint.
+
+    With resume=True an existing checkpoint at `path` is continued: the
+    sampler, RNG and monitor are restored from it and sampling picks up at
+    the checkpointed draw, reproducing an uninterrupted run exactly. Returns
+    the store and the (possibly restored) monitor.
+    """
+    if monitor is not None and len(monitor) != sampler.n_chains:
+        raise ValueError("monitor needs one accumulator per chain")
+    if resume and os.path.exists(path + ".ckpt"):
+        store = ChainStore.open(path)
+        if store.n_chains != sampler.n_chains or store.block_size != block_size:
+            raise ValueError("checkpoint was written with a different chain count or block size")
+        if store.state is not None:
+            sampler.set_state(store.state["sampler"])
+            monitor = store.state["monitor"]
+    else:
+        store = ChainStore.create(path, sampler.n_chains, block_size)
+    blocks = 0
+    while store.n_draws < n_draws:
+        block = sampler.sample(min(block_size, n_draws - store.n_draws))
+        store.append(block)
+        if monitor is not None:
+            for chain_monitor, draws in zip(monitor, block):
+                chain_monitor.update(draws)
+        blocks += 1
+        if blocks % checkpoint_every == 0 or store.n_draws == n_draws:
+            store.checkpoint({"sampler": sampler.get_state(), "monitor": monitor})
+    return store, monitor
+
+
+if __name__ == "__main__":
+    import tempfile
+    from mcmc import MetropolisHastings
+    from output_analysis import BatchMeans
+
+    def log_target(x):
+        return np.where(x >= 0, -x, -np.inf)  # Exp(1)
+
+    path = os.path.join(tempfile.mkdtemp(), "exp_chain")
+    N = 1_000_000
+
+    # Interrupted run: stop after 300,000 draws, then resume with a fresh sampler.
+    sampler = MetropolisHastings(log_target, np.full(4, 1.0), step_size=1.4, rng=7)
+    sample_to_store(sampler, path, 300_000, checkpoint_every=1,
+                    monitor=[BatchMeans() for _ in range(4)])
+    sampler = MetropolisHastings(log_target, np.full(4, 1.0), step_size=1.4, rng=0)
+    store, monitor = sample_to_store(sampler, path, N, checkpoint_every=1,
+                                     monitor=[BatchMeans() for _ in range(4)])
+
+    # Uninterrupted reference run.
+    reference = MetropolisHastings(log_target, np.full(4, 1.0), step_size=1.4, rng=7)
+    ref_store, _ = sample_to_store(reference, path + "_ref", N, resume=False)
+
+    print(f"Stored draws: {store.draws().shape}, file: {os.path.getsize(store.draws_path) / 1e6:.1f} MB")
+    print(f"Resumed run identical to uninterrupted run: {np.array_equal(store.draws(), ref_store.draws())}")
+    for k, batch_means in enumerate(monitor):
+        estimate = batch_means.estimate()
+        print(f"Chain {k} mean: {estimate.mean:.4f} (MCSE {estimate.mcse:.4f})")
@@ -0,0 +1,40 @@
+import numpy as np
+
+# --- Mock Old Faithful eruption lengths ---
+# A two-component normal mixture with exactly n1 = int(n * p_short) short
+# eruptions placed at uniformly random positions. Instead of concatenating the
+# components and shuffling the whole array (a cache-hostile pass over n values),
+# the number of short eruptions in each block of `block_size` positions is drawn
+# jointly from the multivariate hypergeometric distribution and each block is
+# shuffled on its own, which gives the same uniformly random arrangement.
+
+
+def generate_faithful_mock_data(n: int = 200, p_short: float = 0.4, rng=None,
+                                block_size: int = 1 << 16) -> np.ndarray:
+    """
+    Generates a synthetic bimodal dataset to mimic Old Faithful eruption lengths.
+    It mixes two normal distributions: Short Eruptions and Long Eruptions.
+
+    Short: mean 2.0, sd 0.3 (a fraction p_short of the data); Long: mean 4.5,
+    sd 0.5. Returns a float64 array of length n.
+    """
+    if n < 0 or not 0.0 <= p_short <= 1.0:
+        raise ValueError("n must be non-negative and p_short in [0, 1]")
+    rng = np.random.default_rng(rng)
+    n1 = int(n * p_short)
+
+    data = rng.standard_normal(n)
+    n_blocks = -(-n // block_size)
+    sizes = np.full(n_blocks, block_size, dtype=np.int64)
+    if n_blocks:
+        sizes[-1] = n - block_size * (n_blocks - 1)
+    shorts = rng.multivariate_hypergeometric(sizes, n1, method="marginals")
+
+    for start, size, k in zip(range(0, n, block_size), sizes, shorts):
+        block = data[start:start + size]
+        block[:k] *= 0.3
+        block[:k] += 2.0
+        block[k:] *= 0.5
+        block[k:] += 4.5
+        rng.shuffle(block)
+    return data
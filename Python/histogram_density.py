@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Iterable, Tuple
+
+# --- Streaming histogram density ---
+# np.histogram needs the whole sample in memory at once. Counts over fixed
+# breaks are additive, so the same histogram can be built chunk by chunk (e.g.
+# from a memory-mapped file) in O(bins) memory, and partial histograms from
+# parallel workers combine by adding their counts.
+
+
+class HistogramAccumulator:
+    """
+    Fixed-break histogram that ingests data in chunks.
+
+    Bins follow np.histogram: [b0, b1), [b1, b2), ..., [b_{k-1}, b_k], with
+    the last bin closed. Values below b0 or above b_k are tallied in
+    `underflow` / `overflow`, NaNs in `missing`; none of them enter the bins.
+    """
+
+    def __init__(self, breaks):
+        breaks = np.asarray(breaks, dtype=np.float64)
+        if breaks.ndim != 1 or len(breaks) < 2 or np.any(np.diff(breaks) <= 0):
+            raise ValueError("breaks must be a strictly increasing 1-D array of length >= 2")
+        self.breaks = breaks
+        widths = np.diff(breaks)
+        # Equal-width breaks allow O(1) arithmetic binning instead of a search.
+        self._uniform = np.allclose(widths, widths[0], rtol=1e-12, atol=0)
+        self.counts = np.zeros(len(breaks) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.missing = 0
+
+    @property
+    def n(self) -> int:
+        """Number of values seen, in range or not."""
+        return int(self.counts.sum()) + self.underflow + self.overflow + self.missing
+
+    def add(self, chunk) -> "HistogramAccumulator":
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        nan = np.isnan(chunk)
+        if nan.any():
+            self.missing += int(nan.sum())
+            chunk = chunk[~nan]
+        k = len(self.counts)
+        lo, hi = self.breaks[0], self.breaks[-1]
+        below = chunk < lo
+        above = chunk > hi
+        n_below = int(np.count_nonzero(below))
+        n_above = int(np.count_nonzero(above))
+        if n_below or n_above:
+            self.underflow += n_below
+            self.overflow += n_above
+            chunk = chunk[~(below | above)]
+        if self._uniform:
+            idx = ((chunk - lo) * (k / (hi - lo))).astype(np.intp)
+            np.clip(idx, 0, k - 1, out=idx)
+            # Rounding can put values next to a break one bin off; compare with
+            # the actual breaks, as np.histogram does.
+            idx -= chunk < self.breaks[idx]
+            idx += (chunk >= self.breaks[idx + 1]) & (idx < k - 1)
+        else:
+            idx = np.searchsorted(self.breaks, chunk, side="right") - 1
+            np.minimum(idx, k - 1, out=idx)  # last bin is closed on the right
+        self.counts += np.bincount(idx, minlength=k)
+        return self
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        """Adds another accumulator's counts (e.g. from a parallel worker) into this one."""
+        if not np.array_equal(self.breaks, other.breaks):
+            raise ValueError("cannot merge histograms with different breaks")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.missing += other.missing
+        return self
+
+    def density(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (density, mids, bin_edges), matching np.histogram(data, bins=breaks,
+        density=True): counts are normalised by the in-range total, so the
+        histogram integrates to 1 over the breaks.
+        """
+        total = self.counts.sum()
+        if total == 0:
+            raise ValueError("no values fell inside the breaks")
+        widths = np.diff(self.breaks)
+        density = self.counts / total / widths
+        mids = (self.breaks[:-1] + self.breaks[1:]) / 2
+        return density, mids, self.breaks.copy()
+
+
+def iter_file_chunks(path: str, chunk_size: int = 1 << 22, dtype="float64") -> Iterable[np.ndarray]:
+    """
+    Yields consecutive chunks of a large numeric file without loading it:
+    `.npy` files are opened with np.load(mmap_mode='r'), anything else is
+    read as a raw flat array of `dtype` through np.memmap.
+    """
+    if str(path).endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+    else:
+        data = np.memmap(path, dtype=dtype, mode="r")
+    data = data.reshape(-1)
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def histogram_density_file(path: str, breaks, chunk_size: int = 1 << 22,
+                           dtype="float64") -> HistogramAccumulator:
+    """Histogram of a (memory-mapped) file, read `chunk_size` values at a time."""
+    acc = HistogramAccumulator(breaks)
+    for chunk in iter_file_chunks(path, chunk_size, dtype):
+        acc.add(chunk)
+    return acc
+
+
+# --- Multi-resolution re-binning and averaged shifted histograms ---
+# Bin counts at any multiple of a fine base width are sums of consecutive base
+# counts, so once the data have been counted on a fine uniform grid every coarser
+# histogram, at any origin on the base grid, is O(bins) work with no rescan. An
+# averaged shifted histogram (ASH) with bin width h and m shifts equals a
+# triangle-weighted moving sum of counts at width h / m (Scott, 1985), which is
+# also computed from the base counts alone.
+
+
+class BinPyramid:
+    """
+    Dyadic pyramid of bin counts over a uniform base histogram.
+
+    levels[l] holds counts for bins of 2^l base widths starting at the first
+    break; a cumulative count array handles every other width and origin.
+    Widths must be integer multiples of the base width and origins must lie
+    on the base grid, so choose the base fine enough (e.g. 2^16 bins) to
+    cover the widths and shifts of interest.
+    """
+
+    def __init__(self, base: HistogramAccumulator):
+        if not base._uniform:
+            raise ValueError("the base histogram must have equal-width breaks")
+        self.breaks = base.breaks.copy()
+        self.delta = (self.breaks[-1] - self.breaks[0]) / len(base.counts)
+        self.n = int(base.counts.sum())
+        if self.n == 0:
+            raise ValueError("no values fell inside the breaks")
+        counts = base.counts.copy()
+        self.levels = [counts]
+        while len(counts) > 1:
+            if len(counts) % 2:
+                counts = np.append(counts, 0)  # empty bin past the last break
+            counts = counts[0::2] + counts[1::2]
+            self.levels.append(counts)
+        self._cumulative = np.concatenate(([0], np.cumsum(base.counts)))
+
+    @classmethod
+    def from_data(cls, data, lo: float, hi: float, base_bins: int = 1 << 16,
+                  chunk_size: int = 1 << 22) -> "BinPyramid":
+        """Counts `data` (array or iterable of chunks) on base_bins equal bins over [lo, hi]."""
+        acc = HistogramAccumulator(np.linspace(lo, hi, base_bins + 1))
+        if isinstance(data, np.ndarray):
+            array = data.reshape(-1)
+            data = (array[i:i + chunk_size] for i in range(0, len(array), chunk_size))
+        for chunk in data:
+            acc.add(chunk)
+        return cls(acc)
+
+    def _base_units(self, value: float, what: str) -> int:
+        units = value / self.delta
+        rounded = int(round(units))
+        if not np.isclose(units, rounded, rtol=0, atol=1e-6):
+            raise ValueError(f"{what} must be a multiple of the base width {self.delta:g}")
+        return rounded
+
+    def rebin(self, width: int, offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (counts, breaks) for bins of `width` base bins whose edges fall on base
+        index `offset` (mod width), covering the whole base range.
+        """
+        K = len(self.levels[0])
+        if width < 1:
+            raise ValueError("width must be a positive number of base bins")
+        offset %= width
+        start = offset - width if offset else 0
+        edges = np.arange(start, K + width, width)
+        edges = edges[:np.searchsorted(edges, K) + 1]
+        level = width.bit_length() - 1
+        if offset == 0 and width == 1 << level and level < len(self.levels):
+            counts = self.levels[level][:len(edges) - 1]
+        else:
+            counts = np.diff(self._cumulative[np.clip(edges, 0, K)])
+        return counts, self.breaks[0] + edges * self.delta
+
+    def histogram(self, h: float, x0: float = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (density, mids, bin_edges) for bin width h and an edge at x0 (default
+        the first base break), like HistogramAccumulator.density().
+        """
+        width = self._base_units(h, "h")
+        offset = 0 if x0 is None else self._base_units(x0 - self.breaks[0], "x0 - lo")
+        counts, edges = self.rebin(width, offset)
+        density = counts / (self.n * h)
+        return density, (edges[:-1] + edges[1:]) / 2, edges
+
+    def ash(self, h: float, m: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Averaged shifted histogram: the mean of m histograms of width h whose
+        origins are shifted by h / m. Returns (density, mids) on the grid of
+        width h / m, which must be a multiple of the base width.
+        """
+        if m < 1:
+            raise ValueError("m must be a positive number of shifts")
+        counts, edges = self.rebin(self._base_units(h / m, "h / m"))
+        i = np.arange(1 - m, m)
+        weights = 1.0 - np.abs(i) / m
+        density = np.convolve(counts, weights) / (self.n * h)
+        # Full convolution: the grid grows by m - 1 narrow bins on each side.
+        step = edges[1] - edges[0]
+        mids = edges[0] + step * (np.arange(len(density)) - (m - 1) + 0.5)
+        return density, mids
@@ -0,0 +1,342 @@
+import numpy as np
+from scipy.signal import fftconvolve
+
+# --- Kernel density estimation ---
+# f_hat(x) = 1/(n h) * sum_i K((x - x_i) / h)
+# The direct form costs O(n * m) for m evaluation points. The binned form
+# spreads each observation linearly over the two nearest nodes of a regular grid
+# (O(n)), then convolves the grid counts with the kernel sampled at the grid
+# spacing via FFT (O(M log M)) and interpolates back to the requested points.
+
+
+def gaussian_kernel(t):
+    """K(t) = 1/sqrt(2*pi) * exp(-t^2/2)"""
+    return np.exp(-0.5 * np.square(t)) / np.sqrt(2 * np.pi)
+
+
+def epanechnikov_kernel(t):
+    """K(t) = 3/4 * (1 - t^2) for |t| < 1, 0 otherwise"""
+    t = np.asarray(t, dtype=np.float64)
+    return np.where(np.abs(t) < 1.0, 0.75 * (1.0 - t * t), 0.0)
+
+
+def rectangular_kernel(t):
+    """K(t) = 1/2 for |t| < 1, 0 otherwise (the naive estimator)"""
+    return np.where(np.abs(np.asarray(t)) < 1.0, 0.5, 0.0)
+
+
+# name -> (kernel, support radius in units of h)
+# The Gaussian is cut at 5 standard deviations, where it is below 1.5e-6.
+KERNELS = {
+    "gaussian": (gaussian_kernel, 5.0),
+    "epanechnikov": (epanechnikov_kernel, 1.0),
+    "rectangular": (rectangular_kernel, 1.0),
+}
+
+
+def _kernel(name: str):
+    if name not in KERNELS:
+        raise ValueError(f"unknown kernel {name!r}; choose from {sorted(KERNELS)}")
+    return KERNELS[name]
+
+
+def linear_bin(data, start: float, delta: float, M: int) -> np.ndarray:
+    """
+    Linear binning onto the grid start + delta * (0..M-1): each observation
+    splits its unit weight between its two neighbouring nodes in proportion to
+    proximity. Observations outside the grid are dropped.
+    """
+    pos = (np.asarray(data, dtype=np.float64) - start) / delta
+    pos = pos[(pos >= 0) & (pos <= M - 1)]
+    left = np.minimum(np.floor(pos).astype(np.intp), M - 2)
+    w = pos - left
+    return (np.bincount(left, weights=1.0 - w, minlength=M)
+            + np.bincount(left + 1, weights=w, minlength=M))
+
+
+def kde_direct(data, x_points, h: float, kernel: str = "gaussian",
+               chunk_size: int = 1_000_000) -> np.ndarray:
+    """
+    Exact KDE evaluated as a (points, n) kernel matrix, processed in blocks
+    of about `chunk_size` matrix cells. O(n * m) work; use it for small n or
+    to cross-check the binned estimate.
+    """
+    K, _ = _kernel(kernel)
+    data = np.asarray(data, dtype=np.float64)
+    x_points = np.asarray(x_points, dtype=np.float64)
+    n = len(data)
+    fhat = np.empty(len(x_points))
+    rows = max(1, chunk_size // max(n, 1))
+    for start in range(0, len(x_points), rows):
+        x = x_points[start:start + rows, np.newaxis]
+        fhat[start:start + rows] = K((x - data) / h).sum(axis=1)
+    return fhat / (n * h)
+
+
+def kde_binned(data, h: float, kernel: str = "gaussian", grid_size: int = 4096,
+               lo: float = None, hi: float = None):
+    """
+    Binned FFT KDE on its own regular grid. Returns (grid, fhat).
+
+    The grid spans [lo, hi], by default the data range widened by the kernel
+    support so that no mass is lost at the edges. Cost is O(n + M log M) for
+    M = grid_size, independent of n once the data are binned.
+    """
+    K, support = _kernel(kernel)
+    data = np.asarray(data, dtype=np.float64)
+    n = len(data)
+    if n == 0:
+        raise ValueError("data must be non-empty")
+    if h <= 0:
+        raise ValueError("bandwidth h must be positive")
+    lo = data.min() - support * h if lo is None else lo
+    hi = data.max() + support * h if hi is None else hi
+    grid, delta = np.linspace(lo, hi, grid_size, retstep=True)
+
+    counts = linear_bin(data, lo, delta, grid_size)
+    L = min(grid_size - 1, int(np.ceil(support * h / delta)))
+    kvals = K(np.arange(-L, L + 1) * delta / h)
+    fhat = fftconvolve(counts, kvals, mode="same") / (n * h)
+    return grid, np.maximum(fhat, 0.0)  # FFT round-off can give tiny negatives
+
+
+# --- Exact naive (rectangular) estimator by window counting ---
+# With K(t) = 1/2 on |t| < 1, f_hat(x) is just the number of observations in
+# the open window (x - h, x + h) divided by 2 n h. On sorted data that count is
+# the difference of two binary searches, for any evaluation points.
+def _window_counts(sorted_data: np.ndarray, x_points: np.ndarray, h: float) -> np.ndarray:
+    upper = np.searchsorted(sorted_data, x_points + h, side="left")
+    lower = np.searchsorted(sorted_data, x_points - h, side="right")
+    return upper - lower
+
+
+def naive_density(data, x_points, h: float, assume_sorted: bool = False) -> np.ndarray:
+    """
+    Exact naive density estimate at arbitrary (not necessarily uniform or
+    sorted) x_points in O((n + m) log n): one sort, then two searchsorted
+    calls per point. Pass assume_sorted=True to skip the sort.
+    """
+    if h <= 0:
+        raise ValueError("bandwidth h must be positive")
+    data = np.asarray(data, dtype=np.float64)
+    if not assume_sorted:
+        data = np.sort(data)
+    x_points = np.asarray(x_points, dtype=np.float64)
+    return _window_counts(data, x_points, h) / (2 * len(data) * h)
+
+
+def naive_density_stream(chunks, x_points, h: float, presorted: bool = False) -> np.ndarray:
+    """
+    Naive density estimate over data arriving as an iterable of chunks, e.g.
+    consecutive slices of a large file. Window counts are additive over
+    chunks, so only one chunk and the m counts are held at a time. Each chunk
+    is sorted on arrival; pass presorted=True to skip that for sorted chunks.
+    """
+    if h <= 0:
+        raise ValueError("bandwidth h must be positive")
+    x_points = np.asarray(x_points, dtype=np.float64)
+    counts = np.zeros(len(x_points), dtype=np.int64)
+    n = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if not presorted:
+            chunk = np.sort(chunk)
+        counts += _window_counts(chunk, x_points, h)
+        n += len(chunk)
+    if n == 0:
+        raise ValueError("no data in stream")
+    return counts / (2 * n * h)
+
+
+def kernel_density(data, x_points, h: float, kernel: str = "gaussian",
+                   method: str = "auto", grid_size: int = 4096) -> np.ndarray:
+    """
+    Kernel density estimate at `x_points`, with a 'gaussian', 'epanechnikov'
+    or 'rectangular' kernel.
+
+    method='direct' is the exact O(n * m) sum; method='fft' bins the data
+    onto a grid covering both the data and the evaluation points, convolves
+    by FFT and interpolates linearly to x_points. 'auto' picks 'direct' while
+    n * m <= 10^7. The rectangular kernel is always evaluated exactly with
+    naive_density(), which is faster than either.
+    """
+    if method not in ("auto", "direct", "fft"):
+        raise ValueError("method must be 'auto', 'direct' or 'fft'")
+    data = np.asarray(data, dtype=np.float64)
+    x_points = np.asarray(x_points, dtype=np.float64)
+    if kernel == "rectangular":
+        return naive_density(data, x_points, h)
+    if method == "auto":
+        method = "direct" if len(data) * len(x_points) <= 10_000_000 else "fft"
+    if method == "direct":
+        return kde_direct(data, x_points, h, kernel)
+
+    _, support = _kernel(kernel)
+    lo = min(data.min() - support * h, x_points.min())
+    hi = max(data.max() + support * h, x_points.max())
+    grid, fhat = kde_binned(data, h, kernel, grid_size, lo, hi)
+    return np.interp(x_points, grid, fhat)
+
+
+# --- Online binned KDE ---
+# The binned estimate only depends on the grid counts, and linear binning of one
+# observation touches two grid nodes. A stream can therefore be absorbed with
+# O(1) work per observation; the O(M log M) convolution is redone only when the
+# density is queried after the counts have changed.
+class OnlineKDE:
+    """
+    Binned KDE over a fixed grid of `grid_size` nodes on [lo, hi] that is
+    updated in place as observations arrive. Observations outside [lo, hi]
+    count towards n but contribute no mass on the grid.
+
+    Older observations can be forgotten in one of two ways:
+    decay=lam (0 < lam < 1) multiplies the weight of everything seen so far by
+    lam per new observation (an effective memory of about 1 / (1 - lam)
+    observations); window=w keeps only the most recent w observations.
+    """
+
+    # Renormalise the running weights before they leave float64 range.
+    _MAX_LOG_SCALE = 230.0
+
+    def __init__(self, lo: float, hi: float, h: float, kernel: str = "gaussian",
+                 grid_size: int = 1024, decay: float = None, window: int = None):
+        K, support = _kernel(kernel)
+        if not hi > lo:
+            raise ValueError("hi must be greater than lo")
+        if h <= 0:
+            raise ValueError("bandwidth h must be positive")
+        if decay is not None and window is not None:
+            raise ValueError("use either decay or window, not both")
+        if decay is not None and not 0 < decay < 1:
+            raise ValueError("decay must lie in (0, 1)")
+        if window is not None and window < 1:
+            raise ValueError("window must be a positive number of observations")
+        self.h = h
+        self.grid, self.delta = np.linspace(lo, hi, grid_size, retstep=True)
+        L = min(grid_size - 1, int(np.ceil(support * h / self.delta)))
+        self._kvals = K(np.arange(-L, L + 1) * self.delta / h)
+        self.counts = np.zeros(grid_size)
+        self.total = 0.0
+        self.decay = decay
+        # With decay, observation j is stored with weight lam^-j and everything
+        # is divided by the current scale lam^-n on output, so adding needs no
+        # pass over the counts.
+        self._log_growth = 0.0 if decay is None else -np.log(decay)
+        self._log_scale = 0.0
+        self.window = window
+        if window is not None:
+            self._ring = np.empty(window)
+            self._filled = 0
+            self._pos = 0
+        self._fhat = None
+
+    @property
+    def n(self) -> float:
+        """Effective number of observations (a weighted count under decay)."""
+        return self.total * np.exp(-self._log_scale)
+
+    def _deposit(self, x, w):
+        """Linear binning of the observations x with weights w into the counts."""
+        M = len(self.grid)
+        pos = (np.atleast_1d(np.asarray(x, dtype=np.float64)) - self.grid[0]) / self.delta
+        w = np.broadcast_to(w, pos.shape)
+        inside = (pos >= 0) & (pos <= M - 1)
+        pos, wi = pos[inside], w[inside]
+        left = np.minimum(pos.astype(np.intp), M - 2)
+        frac = pos - left
+        np.add.at(self.counts, left, wi * (1.0 - frac))
+        np.add.at(self.counts, left + 1, wi * frac)
+        self.total += float(np.sum(w))
+
+    def _weights(self, size: int) -> np.ndarray:
+        """Storage weights for the next `size` observations under decay."""
+        if self._log_scale + size * self._log_growth > self._MAX_LOG_SCALE:
+            shrink = np.exp(-self._log_scale)
+            if size * self._log_growth > self._MAX_LOG_SCALE:
+                # A batch longer than the representable range: fold its decay
+                # into the existing counts directly.
+                shrink *= np.exp(-size * self._log_growth)
+                self.counts *= shrink
+                self.total *= shrink
+                self._log_scale = 0.0
+                return np.exp(-self._log_growth * np.arange(size - 1, -1, -1))
+            self.counts *= shrink
+            self.total *= shrink
+            self._log_scale = 0.0
+        steps = self._log_scale + self._log_growth * np.arange(1, size + 1)
+        self._log_scale = float(steps[-1])
+        return np.exp(steps)
+
+    def add(self, x: float) -> "OnlineKDE":
+        """Absorbs one observation in O(1)."""
+        if self.window is not None:
+            return self.add_batch([x])
+        w = 1.0 if self.decay is None else float(self._weights(1)[0])
+        # Scalar arithmetic: array calls would cost more than the update itself.
+        M = len(self.counts)
+        pos = (float(x) - self.grid[0]) / self.delta
+        if 0 <= pos <= M - 1:
+            left = min(int(pos), M - 2)
+            frac = pos - left
+            self.counts[left] += w * (1.0 - frac)
+            self.counts[left + 1] += w * frac
+        self.total += w
+        self._fhat = None
+        return self
+
+    def add_batch(self, xs) -> "OnlineKDE":
+        """Absorbs a batch of observations in O(len(xs))."""
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        if len(xs) == 0:
+            return self
+        if self.window is not None:
+            self._slide(xs)
+        elif self.decay is not None:
+            self._deposit(xs, self._weights(len(xs)))
+        else:
+            self._deposit(xs, 1.0)
+        self._fhat = None
+        return self
+
+    def _slide(self, xs: np.ndarray):
+        w = self.window
+        if len(xs) >= w:
+            xs = xs[-w:]
+            self._ring[:] = xs
+            self._filled, self._pos = w, 0
+            self._rebuild()
+            return
+        idx = (self._pos + np.arange(len(xs))) % w
+        # Slots fill in order from 0, so the first w - filled writes go to
+        # empty slots and the rest overwrite the oldest entries.
+        overwritten = idx[w - self._filled:]
+        if len(overwritten):
+            self._deposit(self._ring[overwritten], -1.0)
+        self._ring[idx] = xs
+        self._deposit(xs, 1.0)
+        self._filled = min(w, self._filled + len(xs))
+        wrapped = self._pos + len(xs) >= w
+        self._pos = (self._pos + len(xs)) % w
+        if wrapped:
+            # Re-bin from scratch once per pass over the ring so that the
+            # round-off of repeated add/subtract cannot build up: O(M + w)
+            # every w observations.
+            self._rebuild()
+
+    def _rebuild(self):
+        self.counts = linear_bin(self._ring[:self._filled], self.grid[0], self.delta, len(self.grid))
+        self.total = float(self._filled)
+
+    def density(self):
+        """(grid, fhat) for the current data; convolved only if data arrived since the last call."""
+        if self.total <= 0:
+            raise ValueError("no observations yet")
+        if self._fhat is None:
+            fhat = fftconvolve(self.counts, self._kvals, mode="same") / (self.total * self.h)
+            self._fhat = np.maximum(fhat, 0.0)
+        return self.grid, self._fhat
+
+    def __call__(self, x_points) -> np.ndarray:
+        """Density at x_points by linear interpolation on the grid, 0 outside it."""
+        grid, fhat = self.density()
+        return np.interp(x_points, grid, fhat, left=0.0, right=0.0)
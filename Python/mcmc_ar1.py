@@ -1,81 +1,29 @@
 import numpy as np
-from scipy.stats import t
 import matplotlib.pyplot as plt
+from ar1 import AR1Chain
+from output_analysis import BatchMeans
+from mcmc_diagnostics import integrated_autocorrelation_time
 
-# --- 1. MCMC Helper Functions ---
-
-def ar1_step(m: float, rho: float, tau: float) -> float:
-    """
-    Generates the next observation from the AR(1) chain.
-    X_i = rho * X_{i-1} + epsilon_i, where epsilon_i ~ N(0, tau^2)
-    """
-    return rho * m + np.random.normal(0, tau)
-
-def ar1_gen(mc: list, p: int, rho: float, tau: float) -> list:
-    """
-    Extends an existing Markov Chain (MC) by 'p' steps.
-    """
-    current_state = mc[-1] if mc else 0.0 # Start at 0 if chain is empty
-    
-    for _ in range(p):
-        current_state = ar1_step(current_state, rho, tau)
-        mc.append(current_state)
-    return mc
-
-def mcse_batch_means(chain: np.ndarray, batch_size: int = None) -> float:
-    """
-    Calculates the Monte Carlo Standard Error (MCSE) using the Batch Means method.
-    The batch size is typically floor(sqrt(N)).
-    Returns the standard error of the mean estimate.
-    """
-    N = len(chain)
-    if N < 10:
-        return np.inf # Cannot reliably calculate MCSE on tiny chain
-
-    if batch_size is None:
-        batch_size = max(1, int(np.floor(np.sqrt(N))))
-    
-    # K = number of batches
-    K = N // batch_size
-    
-    if K < 2:
-        # Not enough batches, use a smaller batch size or return estimate
-        if batch_size > 1:
-            return mcse_batch_means(chain, batch_size=batch_size // 2)
-        return np.std(chain, ddof=1) / np.sqrt(N) # Fallback to naive SE
-
-    # Truncate the chain to be evenly divisible into K batches
-    truncated_chain = chain[:K * batch_size]
-    
-    # Reshape the chain to (K batches, batch_size)
-    batches = truncated_chain.reshape(K, batch_size)
-    
-    # Calculate the mean of each batch
-    batch_means = np.mean(batches, axis=1)
-    
-    # Calculate the variance of the batch means
-    # The estimated variance of the overall mean is: 
-    # (batch_size / K) * variance(batch_means)
-    # The MCSE is the square root of the estimated variance of the mean.
-    # Note: np.std(..., ddof=1) calculates standard deviation (divides by K-1)
-    mcse = (np.std(batch_means, ddof=1) / np.sqrt(K)) * np.sqrt(batch_size)
-    
-    return mcse
-
-# --- 2. Simulation Parameters ---
-np.random.seed(20) # for reproducibility
+# --- 1. Simulation Parameters ---
+seed = 20           # for reproducibility
 tau = 1.0           # StdDev of the noise epsilon
 rho = 0.95          # Autoregressive coefficient
 eps = 0.1           # Target half-width for the confidence interval (w_n <= 0.2)
 start = 1000        # Initial burn-in/run length
 r = 1000            # Iterations to add in subsequent runs
 confidence_level = 0.95
-alpha = 1 - confidence_level
 
-# --- 3. Stopping Rule Execution ---
-out = []
+# --- 2. Stopping Rule Execution ---
+# BatchMeans keeps running batch sums with batch size ~ floor(sqrt(N)), so each
+# check only costs the new draws instead of a pass over the whole chain.
+# Its MCSE is sd(batch means) / sqrt(number of batches), i.e. sigma_hat / sqrt(N)
+# with sigma_hat^2 = b * var(batch means).
+# The chain lives in a growable buffer and is extended a block at a time,
+# continuing exactly from its last state (starting at 0).
+chain = AR1Chain(rho, tau, initial=0.0, rng=seed)
 # Initialize with the start run
-out = ar1_gen(out, start, rho, tau)
+first_run = chain.extend(start)
+batch_means = BatchMeans(confidence_level)
 
 # Lists to store history for plotting (like in the R example)
 mcse_history = []
@@ -84,18 +32,14 @@ N_history = []
 half_width_history = [] # New list for plotting interval widths
 
 # Initial check
-N = len(out)
-MCSE = mcse_batch_means(np.array(out))
-# Degrees of freedom for t-distribution (based on batch means K-1)
-K_initial = max(1, int(np.floor(np.sqrt(N))))
-df = max(1, K_initial - 1)
-t_quantile = t.ppf(1 - alpha/2, df) # t_{0.975}
-check_half_width = MCSE * t_quantile
+# Degrees of freedom for the t-quantile are (number of batches - 1)
+estimate = batch_means.update(first_run)
+check_half_width = estimate.half_width
 
 # Store initial results
-mcse_history.append(MCSE)
-muhat_history.append(np.mean(out))
-N_history.append(N)
+mcse_history.append(estimate.mcse)
+muhat_history.append(estimate.mean)
+N_history.append(estimate.n)
 half_width_history.append(check_half_width)
 
 print(f"--- AR(1) MCMC Fixed-Width Stopping Rule ---")
@@ -107,25 +51,16 @@ while eps < check_half_width:
     print(f"Run {run_count}: N={N_history[-1]}, Half-Width={check_half_width:.4f} (Still running...)")
     
     # Extend the chain
-    out = ar1_gen(out, r, rho, tau)
-    
-    # Recalculate diagnostics
-    current_chain = np.array(out)
-    N = len(current_chain)
-    MCSE = mcse_batch_means(current_chain)
-    
-    # Update degrees of freedom based on batch size K=floor(sqrt(N))
-    K_new = max(1, int(np.floor(np.sqrt(N))))
-    df = max(1, K_new - 1)
+    new_draws = chain.extend(r)
     
-    # Get new t-quantile
-    t_quantile = t.ppf(1 - alpha/2, df)
-    check_half_width = MCSE * t_quantile
+    # Update diagnostics with the new draws only
+    estimate = batch_means.update(new_draws)
+    check_half_width = estimate.half_width
     
     # Store history
-    mcse_history.append(MCSE)
-    muhat_history.append(np.mean(current_chain))
-    N_history.append(N)
+    mcse_history.append(estimate.mcse)
+    muhat_history.append(estimate.mean)
+    N_history.append(estimate.n)
     half_width_history.append(check_half_width)
     
     run_count += 1
@@ -134,8 +69,10 @@ print(f"Run {run_count}: N={N_history[-1]}, Half-Width={check_half_width:.4f} (S
 print(f"\nFinal Estimate of Mean (E[X]): {muhat_history[-1]:.4f}")
 print(f"Final MCSE: {mcse_history[-1]:.4e}")
 print(f"Total iterations required: {N_history[-1]}")
+tau_hat = integrated_autocorrelation_time(chain.chain)
+print(f"Integrated autocorrelation time: {tau_hat:.2f} (theoretical {(1 + rho) / (1 - rho):.2f}), ESS: {N_history[-1] / tau_hat:.0f}")
 
-# --- 4. Plotting the Diagnostics ---
+# --- 3. Plotting the Diagnostics ---
 
 # Convert history lists to NumPy arrays for vectorized operations
 N_arr = np.array(N_history)
@@ -0,0 +1,207 @@
+import numpy as np
+from scipy import fft
+from scipy.special import ndtri
+
+# --- Convergence and efficiency diagnostics for MCMC output ---
+# The autocovariance of a chain at every lag is the inverse FFT of its
+# zero-padded power spectrum, O(N log N) instead of O(N^2) for all lags. ESS and
+# R-hat follow Vehtari, Gelman, Simpson, Carpenter and Buerkner (2021):
+# autocorrelations are combined across chains, summed in pairs until the first
+# non-positive pair (Geyer's initial positive sequence, made monotone), and the
+# bulk and tail variants are computed on rank-normalized split chains.
+# All functions take a (chains, draws) array; a 1-D array is a single chain.
+
+
+def _as_chains(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[np.newaxis, :]
+    if x.ndim != 2:
+        raise ValueError("expected a (chains, draws) array")
+    return x
+
+
+def autocovariance(x, max_cells: int = 1 << 24) -> np.ndarray:
+    """
+    Biased autocovariance (divided by N) of each chain at lags 0..N-1, by
+    FFT. Chains are transformed in groups of about `max_cells` draws to
+    bound the memory of the padded transforms.
+    """
+    x = _as_chains(x)
+    K, N = x.shape
+    size = fft.next_fast_len(2 * N, real=True)
+    acov = np.empty((K, N))
+    rows = max(1, max_cells // size)
+    for start in range(0, K, rows):
+        block = x[start:start + rows]
+        spectrum = fft.rfft(block - block.mean(axis=1, keepdims=True), n=size, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        acov[start:start + rows] = fft.irfft(power, n=size, axis=1)[:, :N] / N
+    return acov
+
+
+def autocorrelation(x) -> np.ndarray:
+    """Autocorrelation function of each chain, lags 0..N-1."""
+    acov = autocovariance(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return acov / acov[:, :1]
+
+
+def _combined_autocorrelation(x: np.ndarray, max_cells: int = 1 << 24) -> np.ndarray:
+    """
+    Multi-chain autocorrelation rho_t = 1 - (W - mean_chain acov_t) / var_plus.
+    Only the chain-averaged autocovariance is accumulated, never the full
+    (chains, draws) array of autocovariances.
+    """
+    K, N = x.shape
+    size = fft.next_fast_len(2 * N, real=True)
+    mean_acov = np.zeros(N)
+    rows = max(1, max_cells // size)
+    for start in range(0, K, rows):
+        block = x[start:start + rows]
+        spectrum = fft.rfft(block - block.mean(axis=1, keepdims=True), n=size, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mean_acov += fft.irfft(power, n=size, axis=1)[:, :N].sum(axis=0)
+    mean_acov /= K * N
+    W = mean_acov[0] * N / (N - 1)
+    var_plus = W * (N - 1) / N
+    if K > 1:
+        var_plus += np.var(x.mean(axis=1), ddof=1)
+    return 1.0 - (W - mean_acov) / var_plus
+
+
+def integrated_autocorrelation_time(x) -> float:
+    """
+    tau = 1 + 2 sum_t rho_t, truncated by Geyer's initial positive sequence:
+    pairs P_k = rho_{2k} + rho_{2k+1} are summed up to the first non-positive
+    one and forced to be non-increasing. Returns inf for a constant chain.
+    """
+    x = _as_chains(x)
+    K, N = x.shape
+    if N < 4:
+        raise ValueError("need at least 4 draws per chain")
+    rho = _combined_autocorrelation(x)
+    if not np.isfinite(rho[0]):
+        return np.inf
+    pairs = rho[:N - N % 2].reshape(-1, 2).sum(axis=1)
+    nonpositive = np.flatnonzero(pairs <= 0)
+    pairs = pairs[:nonpositive[0] if len(nonpositive) else len(pairs)]
+    pairs = np.minimum.accumulate(pairs)  # initial monotone sequence
+    tau = -1.0 + 2.0 * pairs.sum()
+    # Antithetic chains can give tau < 1; cap the ESS at N log10(N) like Stan.
+    return max(tau, 1.0 / np.log10(K * N))
+
+
+def effective_sample_size(x) -> float:
+    """K * N / tau for a (chains, draws) array, without splitting or ranking."""
+    x = _as_chains(x)
+    return x.size / integrated_autocorrelation_time(x)
+
+
+def _split(x: np.ndarray) -> np.ndarray:
+    """
+    Splits every chain into halves (dropping the middle draw for odd N). For
+    even N and contiguous input this is a reshape, so no copy is made.
+    """
+    K, N = x.shape
+    if N % 2:
+        x = np.delete(x, N // 2, axis=1)
+    return x.reshape(2 * K, N // 2)
+
+
+def _sorted_normal_scores(x: np.ndarray):
+    """
+    (order, scores): the argsort of the pooled draws and, in that sorted
+    order, the normal scores ndtri((rank - 3/8) / (S + 1/4)) of their average
+    ranks. Works in place on one sorted copy to keep peak memory at about
+    three times the input for 10^8-draw arrays.
+    """
+    flat = x.reshape(-1)
+    S = flat.size
+    order = np.argsort(flat)
+    values = flat[order]
+    tied = np.empty(S, dtype=bool)  # tied[i]: values[i] equals values[i - 1]
+    tied[0] = False
+    np.equal(values[1:], values[:-1], out=tied[1:])
+    scores = values  # reuse the sorted copy for the ranks 1..S
+    step = 1 << 22
+    for start in range(0, S, step):
+        scores[start:start + step] = np.arange(start + 1, min(start + step, S) + 1)
+    if tied.any():
+        # Each run of equal values gets the average of its ranks; the work
+        # and memory are proportional to the number of tied draws only.
+        edges = np.diff(tied.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+        first = np.flatnonzero(edges == 1) - 1
+        stop = np.flatnonzero(edges == -1)
+        lengths = stop - first
+        offsets = np.repeat(first - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(lengths.sum())
+        scores[positions] = np.repeat((first + stop + 1) / 2.0, lengths)
+    del tied
+    scores -= 0.375
+    scores /= S + 0.25
+    return order, ndtri(scores, out=scores)
+
+
+def _rank_normalize(x: np.ndarray) -> np.ndarray:
+    """Normal scores of the pooled ranks (average ranks for ties), in the shape of x."""
+    order, scores = _sorted_normal_scores(x)
+    out = np.empty(x.size)
+    out[order] = scores
+    return out.reshape(x.shape)
+
+
+def bulk_ess(x) -> float:
+    """ESS of the rank-normalized split chains: efficiency for the centre of the distribution."""
+    return effective_sample_size(_rank_normalize(_split(_as_chains(x))))
+
+
+def tail_ess(x, prob: float = 0.05) -> float:
+    """
+    Minimum ESS of the indicators I(x <= q_prob) and I(x <= q_{1-prob}) on
+    split chains: efficiency for the tail quantiles.
+    """
+    x = _split(_as_chains(x))
+    lo, hi = np.quantile(x, [prob, 1 - prob])
+    return min(effective_sample_size((x <= lo).astype(np.float64)),
+               effective_sample_size((x <= hi).astype(np.float64)))
+
+
+def _rhat_from_moments(means: np.ndarray, variances: np.ndarray, N: int) -> float:
+    W = variances.mean()
+    B = N * np.var(means, ddof=1)
+    return float(np.sqrt(((N - 1) / N * W + B / N) / W))
+
+
+def _rhat(x: np.ndarray) -> float:
+    K, N = x.shape
+    return _rhat_from_moments(x.mean(axis=1), np.var(x, axis=1, ddof=1), N)
+
+
+def _rank_rhat(x: np.ndarray) -> float:
+    """R-hat of the rank-normalized chains, accumulated per chain in sorted order."""
+    K, N = x.shape
+    order, scores = _sorted_normal_scores(x)
+    chain = np.floor_divide(order, N, out=order)
+    sums = np.bincount(chain, weights=scores, minlength=K)
+    np.square(scores, out=scores)
+    sum_sq = np.bincount(chain, weights=scores, minlength=K)
+    means = sums / N
+    variances = (sum_sq - N * means ** 2) / (N - 1)
+    return _rhat_from_moments(means, variances, N)
+
+
+def split_rhat(x, rank_normalize: bool = True) -> float:
+    """
+    Split R-hat over (chains, draws). With rank_normalize=True this is the
+    rank-normalized version: the maximum of the R-hat of the normal scores
+    and of the folded draws |x - median|, which also detects chains that
+    agree in location but not in scale.
+    """
+    x = _split(_as_chains(x))
+    if not rank_normalize:
+        return _rhat(x)
+    bulk = _rank_rhat(x)
+    folded = np.subtract(x, np.median(x))
+    np.abs(folded, out=folded)
+    return max(bulk, _rank_rhat(folded))
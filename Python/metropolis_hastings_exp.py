@@ -1,58 +1,39 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from mcmc import metropolis_hastings_chains
+from mcmc_diagnostics import bulk_ess, integrated_autocorrelation_time, split_rhat, tail_ess
 
 # --- Target Distribution (Exp(1)) ---
-def target_pdf(x):
-    """Unnormalized PDF of the Exponential(lambda=1) distribution."""
-    if x < 0:
-        return 0.0
-    # pdf(x) = lambda * exp(-lambda * x). With lambda=1, it's exp(-x).
-    return np.exp(-x)
+def log_target(x):
+    """
+    Unnormalized log-PDF of the Exponential(lambda=1) distribution, for an
+    array of states: log(exp(-x)) = -x for x >= 0, and -inf (zero density)
+    below zero.
+    """
+    return np.where(x >= 0, -x, -np.inf)
 
 # --- Proposal Distribution ---
 # q(x'|x) = N(x, sigma^2). This is symmetric, so q(x|x') = q(x'|x).
-# The ratio q(x|x') / q(x'|x) simplifies to 1 in the acceptance ratio.
-def proposal_draw(current_x, step_size):
-    """Draw a candidate sample x' from N(current_x, step_size^2)"""
-    return np.random.normal(current_x, step_size)
-
-# --- Metropolis-Hastings Sampler ---
-def metropolis_hastings(target_pdf, proposal_draw, step_size, initial_x, n_samples):
-    samples = np.zeros(n_samples)
-    current_x = initial_x
-    
-    for i in range(n_samples):
-        # 1. Propose a candidate x'
-        proposed_x = proposal_draw(current_x, step_size)
-        
-        # 2. Compute acceptance ratio $\alpha$ (using unnormalized densities)
-        # alpha = min(1, [pi(x') * q(x|x')] / [pi(x) * q(x'|x)])
-        # For a symmetric proposal, q ratio is 1.
-        
-        # Log-acceptance ratio for numerical stability:
-        # log_alpha = min(0, log(pi(x')) - log(pi(x)))
-        log_alpha = np.log(target_pdf(proposed_x)) - np.log(target_pdf(current_x))
-        alpha = np.exp(min(0, log_alpha)) # np.exp(0) = 1
-        
-        # 3. Accept or Reject
-        if np.random.rand() < alpha:
-            current_x = proposed_x # Accept
-            
-        samples[i] = current_x # Store the current state (accepted or rejected)
-        
-    return samples
+# The ratio q(x|x') / q(x'|x) simplifies to 1 in the acceptance ratio:
+# log_alpha = min(0, log(pi(x')) - log(pi(x))).
 
 # --- Run Simulation ---
-N = 50000        # Number of samples
-BURN_IN = 1000   # Number of samples to discard
-STEP_SIZE = 1.0  # Proposal standard deviation (tuning parameter)
+N = 50000        # Number of samples per chain
+BURN_IN = 1000   # Burn-in steps, used to tune the step size and then discarded
+STEP_SIZE = 1.0  # Initial proposal standard deviation (tuned during burn-in)
+TARGET_ACCEPTANCE = 0.44  # Optimal rate for one-dimensional random-walk MH
+CHAINS = 8       # Independent chains, advanced together as arrays
 
 # Since Exp(1) is only defined for x >= 0, we choose a non-negative start.
-initial_x = 2.0 
+initial_x = np.full(CHAINS, 2.0)
 
-print(f"Running MH for Exp(1) with N={N} and step_size={STEP_SIZE}...")
-mh_samples = metropolis_hastings(target_pdf, proposal_draw, STEP_SIZE, initial_x, N)
-final_samples = mh_samples[BURN_IN:]
+print(f"Running MH for Exp(1) with {CHAINS} chains, N={N}, adapting step_size during {BURN_IN} burn-in steps...")
+result = metropolis_hastings_chains(log_target, initial_x, N, STEP_SIZE, rng=2024,
+                                    adapt_steps=BURN_IN, target_acceptance=TARGET_ACCEPTANCE)
+mh_samples = result.samples  # shape (CHAINS, N), burn-in already discarded
+final_samples = mh_samples.ravel()
+STEP_SIZE = result.step_size.mean()
+print(f"Tuned step size: {STEP_SIZE:.3f}")
 
 # --- Plotting Results ---
 x = np.linspace(0, 8, 1000)
@@ -62,7 +43,7 @@ true_pdf = np.exp(-x)
 plt.figure(figsize=(10, 6))
 plt.hist(final_samples, bins=50, density=True, label='MH Samples (Normalized Histogram)', alpha=0.7)
 plt.plot(x, true_pdf, 'r-', linewidth=2, label='True Exp(1) PDF')
-plt.title(f'Metropolis-Hastings Sampler for Exp(1) (Step Size $\sigma$={STEP_SIZE})')
+plt.title(f'Metropolis-Hastings Sampler for Exp(1) (Step Size $\sigma$={STEP_SIZE:.2f})')
 plt.xlabel('x')
 plt.ylabel('Density')
 plt.legend()
@@ -72,4 +53,7 @@ plt.show()
 
 # Print mean for comparison (True mean of Exp(1) is 1.0)
 print(f"Sample Mean: {np.mean(final_samples):.4f}")
-print(f"Acceptance Rate: {np.sum(np.diff(mh_samples) != 0) / (N - 1):.4f}")
\ No newline at end of file
+print(f"Acceptance Rate: {result.acceptance_rate.mean():.4f}")
+print(f"Integrated autocorrelation time: {integrated_autocorrelation_time(mh_samples):.2f}")
+print(f"Bulk ESS: {bulk_ess(mh_samples):.0f}, Tail ESS: {tail_ess(mh_samples):.0f} (of {mh_samples.size} draws)")
+print(f"Split R-hat: {split_rhat(mh_samples):.4f}")
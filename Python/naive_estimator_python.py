@@ -0,0 +1,35 @@
+import numpy as np
+from kde import KERNELS, kernel_density, rectangular_kernel
+
+# --- Generic kernel density estimator ---
+# f_hat(x) = 1/(n h) * sum_i K((x_i - x) / h), for any vectorized kernel K.
+# The kernels known to kde.py go through kernel_density(), which picks an exact
+# or binned method; any other kernel is summed directly over blocks of the
+# (points, n) matrix. Float64 arrays are used as given, without copying.
+
+naive_kernel = rectangular_kernel  # K(t) = 1/2 for |t| < 1, 0 otherwise
+
+
+def kernel_density_estimate(data, x_points, h: float, kernel_func=naive_kernel,
+                            chunk_size: int = 1_000_000) -> np.ndarray:
+    """
+    Kernel density estimate at `x_points`. `kernel_func` is a kernel name from
+    kde.KERNELS or a function K(t) that accepts arrays.
+    """
+    if h <= 0:
+        raise ValueError("bandwidth h must be positive")
+    data = np.asarray(data, dtype=np.float64)
+    x_points = np.asarray(x_points, dtype=np.float64)
+    if isinstance(kernel_func, str):
+        return kernel_density(data, x_points, h, kernel_func)
+    for name, (func, _) in KERNELS.items():
+        if kernel_func is func:
+            return kernel_density(data, x_points, h, name)
+
+    n = len(data)
+    fhat = np.empty(len(x_points))
+    rows = max(1, chunk_size // max(n, 1))
+    for start in range(0, len(x_points), rows):
+        x = x_points[start:start + rows, np.newaxis]
+        fhat[start:start + rows] = kernel_func((data - x) / h).sum(axis=1)
+    return fhat / (n * h)
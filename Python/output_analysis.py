@@ -0,0 +1,241 @@
+import numpy as np
+from scipy.stats import t
+from typing import NamedTuple
+
+# --- Streaming MCMC output analysis ---
+# Recomputing batch means over the whole chain after every extension costs
+# O(N) per check and O(N^2 / r) over a run extended r draws at a time. Only
+# the completed batch sums are needed, and when the batch size doubles the new
+# batch sums are the sums of adjacent pairs of old ones, so the whole state is
+# O(sqrt(N)) numbers and each draw costs O(1) amortized.
+
+
+class MCSEEstimate(NamedTuple):
+    n: int
+    mean: float
+    mcse: float
+    half_width: float
+    df: int
+
+
+class BatchMeans:
+    """
+    Online batch-means Monte Carlo standard error for the mean of a chain.
+
+    The batch size b is kept at the largest power of two not exceeding
+    floor(sqrt(N)), so there are between sqrt(N) and 2 sqrt(N) batches. Each
+    time sqrt(N) passes 2b, adjacent batches are merged in O(number of
+    batches), which happens once every time N quadruples.
+    """
+
+    def __init__(self, confidence_level: float = 0.95):
+        self.confidence_level = confidence_level
+        self.n = 0
+        self.batch_size = 1
+        self._sums = np.empty(64)  # completed batch sums, grown by doubling
+        self._n_batches = 0
+        self._partial = 0.0        # sum of the incomplete trailing batch
+        self._partial_n = 0
+        self._total = 0.0
+        self._shift = None         # first draw; sums are of x - shift for accuracy
+
+    def update(self, chunk) -> MCSEEstimate:
+        """Appends a chunk of draws and returns the current estimate."""
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        if len(chunk) == 0:
+            return self.estimate()
+        if self._shift is None:
+            self._shift = float(chunk[0])
+        chunk = chunk - self._shift
+        self._total += float(chunk.sum())
+        self.n += len(chunk)
+
+        b = self.batch_size
+        fill = min(b - self._partial_n, len(chunk))
+        self._partial += float(chunk[:fill].sum())
+        self._partial_n += fill
+        rest = chunk[fill:]
+        if self._partial_n == b:
+            self._push(np.array([self._partial]))
+            full = len(rest) // b
+            self._push(rest[:full * b].reshape(full, b).sum(axis=1))
+            tail = rest[full * b:]
+            self._partial, self._partial_n = float(tail.sum()), len(tail)
+
+        while 2 * self.batch_size <= int(np.sqrt(self.n)):
+            self._double()
+        return self.estimate()
+
+    def _push(self, sums: np.ndarray):
+        need = self._n_batches + len(sums)
+        if need > len(self._sums):
+            grown = np.empty(max(need, 2 * len(self._sums)))
+            grown[:self._n_batches] = self._sums[:self._n_batches]
+            self._sums = grown
+        self._sums[self._n_batches:need] = sums
+        self._n_batches = need
+
+    def _double(self):
+        k = self._n_batches
+        sums = self._sums[:k]
+        if k % 2:
+            # The odd batch out is the first half of the new trailing batch.
+            self._partial += sums[-1]
+            self._partial_n += self.batch_size
+        pairs = sums[:k - k % 2].reshape(-1, 2).sum(axis=1)
+        self._n_batches = 0
+        self.batch_size *= 2
+        self._push(pairs)
+
+    def estimate(self) -> MCSEEstimate:
+        """Mean, MCSE, t-based half-width and degrees of freedom (K - 1)."""
+        if self.n == 0:
+            return MCSEEstimate(0, np.nan, np.inf, np.inf, 0)
+        mean = self._shift + self._total / self.n
+        K = self._n_batches
+        if self.n < 10 or K < 2:
+            # Too few batches for a variance estimate.
+            return MCSEEstimate(self.n, float(mean), np.inf, np.inf, max(K - 1, 0))
+        batch_means = self._sums[:K] / self.batch_size
+        mcse = np.std(batch_means, ddof=1) * np.sqrt(self.batch_size / self.n)
+        df = K - 1
+        half_width = mcse * t.ppf(1 - (1 - self.confidence_level) / 2, df)
+        return MCSEEstimate(self.n, float(mean), float(mcse), float(half_width), df)
+
+
+# --- Recursive overlapping batch means ---
+# Overlapping batch means average (S_i - l mu)^2 / l over every window sum S_i of
+# length l. Letting the window length grow with the position, l_i = floor(sqrt(i)),
+# gives a recursive estimator (Wu, 2009; Chan and Yau, 2017)
+#     sigma^2 = (1/n) sum_i (S_i - l_i xbar_n)^2 / l_i
+#             = (1/n) [sum S_i^2 / l_i - 2 xbar_n sum S_i + xbar_n^2 sum l_i],
+# whose three running sums never need revisiting when xbar_n changes. Only the
+# last floor(sqrt(n)) draws are kept, to form the next window sums.
+
+
+class OverlappingBatchMeans:
+    """
+    Online estimate of the asymptotic variance sigma^2 of a chain (so that
+    Var(mean) ~ sigma^2 / n) by recursive overlapping batch means, with O(1)
+    work per draw and O(sqrt(n)) memory. Same interface as BatchMeans.
+    """
+
+    def __init__(self, confidence_level: float = 0.95):
+        self.confidence_level = confidence_level
+        self.n = 0
+        self._tail = np.empty(0)  # last floor(sqrt(n)) shifted draws
+        self._total = 0.0
+        self._sq_over_l = 0.0     # sum_i S_i^2 / l_i
+        self._window_sum = 0.0    # sum_i S_i
+        self._lengths = 0.0       # sum_i l_i
+        self._shift = None
+
+    def update(self, chunk) -> MCSEEstimate:
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        if len(chunk) == 0:
+            return self.estimate()
+        if self._shift is None:
+            self._shift = float(chunk[0])
+        chunk = chunk - self._shift
+        n0, m = self.n, len(chunk)
+        data = np.concatenate((self._tail, chunk))
+        cum = np.concatenate(([0.0], np.cumsum(data)))
+        i = np.arange(n0 + 1, n0 + m + 1)
+        lengths = np.maximum(np.sqrt(i).astype(np.int64), 1)
+        end = len(self._tail) + np.arange(1, m + 1)
+        S = cum[end] - cum[end - lengths]
+        self._sq_over_l += float(np.sum(S * S / lengths))
+        self._window_sum += float(S.sum())
+        self._lengths += float(lengths.sum())
+        self._total += float(chunk.sum())
+        self.n += m
+        keep = min(self.n, int(np.sqrt(self.n)))
+        self._tail = data[len(data) - keep:].copy()
+        return self.estimate()
+
+    @property
+    def variance(self) -> float:
+        """Estimated asymptotic variance sigma^2."""
+        xbar = self._total / self.n
+        s = self._sq_over_l - 2 * xbar * self._window_sum + xbar * xbar * self._lengths
+        return max(s, 0.0) / self.n
+
+    def estimate(self) -> MCSEEstimate:
+        if self.n < 10:
+            mean = self._shift + self._total / self.n if self.n else np.nan
+            return MCSEEstimate(self.n, float(mean), np.inf, np.inf, 0)
+        mean = self._shift + self._total / self.n
+        mcse = np.sqrt(self.variance / self.n)
+        # Degrees of freedom of overlapping batch means with batch size b:
+        # about 1.5 (n / b - 1) (Flegal and Jones, 2010).
+        b = max(int(np.sqrt(self.n)), 1)
+        df = max(int(1.5 * (self.n / b - 1)), 1)
+        half_width = mcse * t.ppf(1 - (1 - self.confidence_level) / 2, df)
+        return MCSEEstimate(self.n, float(mean), float(mcse), float(half_width), df)
+
+
+VARIANCE_ESTIMATORS = {
+    "obm": OverlappingBatchMeans,
+    "bm": BatchMeans,
+}
+
+
+class StoppingResult(NamedTuple):
+    estimate: float
+    half_width: float
+    mcse: float
+    n: int
+    ess: float
+    converged: bool
+
+
+def fixed_width_stopping(chunks, epsilon: float, method: str = "obm",
+                         confidence_level: float = 0.95, check_every: int = 1000,
+                         min_samples: int = 1000, max_samples: int = None,
+                         callback=None) -> StoppingResult:
+    """
+    Fixed-width stopping rule for the mean of a chain delivered as an
+    iterable of 1-D chunks (e.g. a generator that extends a sampler).
+
+    The asymptotic variance is estimated online by `method` ('obm' or 'bm');
+    every `check_every` draws (at chunk boundaries) the confidence-interval
+    half-width is compared with `epsilon`, and the run stops once it is
+    below it with at least `min_samples` draws, or when `max_samples` draws
+    or the chunks run out. `callback(estimate)` is called at every check.
+    ESS is n * (sample variance) / sigma^2.
+    """
+    if method not in VARIANCE_ESTIMATORS:
+        raise ValueError(f"unknown method {method!r}; choose from {sorted(VARIANCE_ESTIMATORS)}")
+    estimator = VARIANCE_ESTIMATORS[method](confidence_level)
+    shift = None
+    total = total_sq = 0.0
+    next_check = check_every
+    est = None
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        if max_samples is not None:
+            chunk = chunk[:max_samples - estimator.n]
+        if len(chunk) == 0:
+            break
+        if shift is None:
+            shift = float(chunk[0])
+        centred = chunk - shift
+        total += float(centred.sum())
+        total_sq += float(np.dot(centred, centred))
+        est = estimator.update(chunk)
+        if est.n >= next_check or est.n == max_samples:
+            next_check = est.n + check_every
+            if callback is not None:
+                callback(est)
+            if est.n >= min_samples and est.half_width <= epsilon:
+                break
+        if est.n == max_samples:
+            break
+    if est is None:
+        raise ValueError("no samples were generated")
+    est = estimator.estimate()
+    n = est.n
+    sample_var = (total_sq - total * total / n) / max(n - 1, 1)
+    ess = sample_var / est.mcse ** 2 if est.mcse > 0 else float(n)
+    converged = n >= min_samples and est.half_width <= epsilon
+    return StoppingResult(est.mean, est.half_width, est.mcse, n, float(ess), converged)
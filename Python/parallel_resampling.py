@@ -0,0 +1,114 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional
+
+# --- Sharded resampling across a process pool ---
+# The B replicates are cut into fixed-size shards, and shard k always draws from
+# its own child stream SeedSequence(seed).spawn(...)[k]. Which worker runs a
+# shard therefore never affects its draws, so results are bit-for-bit identical
+# for a given seed and shard_size whatever n_workers is (including 1).
+# The data arrays are copied once into shared memory; each worker attaches to
+# them when it starts, so tasks only carry a shard index and a seed.
+
+_SHARED: Dict[str, np.ndarray] = {}
+_SEGMENTS = []
+
+
+def _attach(specs):
+    """Pool initializer: map the parent's shared-memory blocks as read-only arrays."""
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SEGMENTS.append(shm)  # keep the mapping alive for the worker's lifetime
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        view.flags.writeable = False
+        _SHARED[name] = view
+
+
+def _run_shard(task, seed_seq, size):
+    return task(_SHARED, size, np.random.default_rng(seed_seq))
+
+
+def shard_sizes(B: int, shard_size: int) -> list:
+    """Replicates per shard: full shards of `shard_size` followed by the remainder."""
+    full, rest = divmod(B, shard_size)
+    return [shard_size] * full + ([rest] if rest else [])
+
+
+def sharded_resample(task: Callable, data: Dict[str, np.ndarray], B: int, seed=None,
+                     shard_size: int = 10000, n_workers: Optional[int] = None,
+                     combine: Callable = np.concatenate):
+    """
+    Runs `task(data, size, rng)` over shards of the B replicates and merges
+    the per-shard results in shard order with `combine` (default: concatenate
+    the per-shard statistic arrays into one length-B array). A task can also
+    return a partial reduction, e.g. a count, with combine=sum.
+
+    `task` must be a module-level function (or a functools.partial of one) so
+    the pool can import it; inside it `data` maps the same names to read-only
+    views of the shared arrays. With n_workers=1 the shards run in this
+    process on read-only views as well, with identical results.
+    """
+    if B < 1 or shard_size < 1:
+        raise ValueError("B and shard_size must be positive integers")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    sizes = shard_sizes(B, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in data.items()}
+
+    if n_workers == 1 or len(sizes) == 1:
+        views = {}
+        for name, arr in arrays.items():
+            views[name] = arr.view()  # leaves the caller's own array writeable
+            views[name].flags.writeable = False
+        return combine([task(views, size, np.random.default_rng(s))
+                        for s, size in zip(seeds, sizes)])
+
+    segments = []
+    try:
+        specs = {}
+        for name, arr in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            segments.append(shm)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            specs[name] = (shm.name, arr.shape, arr.dtype)
+
+        workers = min(n_workers, len(sizes))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(specs,)) as pool:
+            parts = list(pool.map(_run_shard, [task] * len(sizes), seeds, sizes))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return combine(parts)
+
+
+# --- Example: the DRP permutation test from Permutation_Test.py, sharded ---
+# permutation_test(..., n_workers=k) runs this same machinery for any statistic;
+# the task below spells it out for the difference in means.
+def _mean_diff_shard(data, size, rng):
+    from permutation import mean_diff_from_sums, random_labels
+    Z, n1 = data["Z"], int(data["n1"][0])
+    s1 = random_labels(rng, len(Z), n1, size) @ Z
+    return mean_diff_from_sums(s1, None, Z.sum(), None, n1, len(Z) - n1)
+
+
+if __name__ == "__main__":
+    T = np.array([24, 43, 58, 71, 61, 44, 67, 49, 59, 52, 62, 54, 46, 43, 57,
+                  43, 57, 56, 53, 49, 33], dtype=float)
+    C = np.array([42, 43, 55, 26, 33, 41, 19, 54, 46, 10, 17, 60, 37, 42, 55,
+                  28, 62, 53, 37, 42, 20, 48, 85], dtype=float)
+    data = {"Z": np.concatenate((T, C)), "n1": np.array([len(T)])}
+    obs_stat = np.mean(T) - np.mean(C)
+
+    B = 1_000_000
+    serial = sharded_resample(_mean_diff_shard, data, B, seed=42, n_workers=1)
+    parallel = sharded_resample(_mean_diff_shard, data, B, seed=42)
+    pvalue = (1 + np.sum(parallel >= obs_stat)) / (B + 1)
+
+    print(f"Workers: {os.cpu_count()}, shards: {len(shard_sizes(B, 10000))}")
+    print(f"Identical to single-process run: {np.array_equal(serial, parallel)}")
+    print(f"Permutation P-value (B={B}): {pvalue:.6f}")
@@ -7,6 +7,7 @@
 import numpy as np
 from scipy.stats import norm
 from scipy.optimize import minimize
+from bootstrap import bootstrap_mean_diff
 
 ################################################
 # 1. BOOTSTRAP RESAMPLING FUNCTION
@@ -30,21 +31,15 @@ print("\n")
 # 2. BOOTSTRAP TWO-SAMPLE DIFFERENCE IN MEANS
 ################################################
 
-def diff_in_means(x, y):
-    """Difference in sample means."""
-    return np.mean(x) - np.mean(y)
-
 # Example data (YOU CAN REPLACE THESE)
 x = np.random.normal(loc=5, scale=2, size=20)
 y = np.random.normal(loc=6, scale=2, size=25)
 
 B = 1000
-boot_stats = []
 
-for _ in range(B):
-    x_star = np.random.choice(x, size=len(x), replace=True)
-    y_star = np.random.choice(y, size=len(y), replace=True)
-    boot_stats.append(diff_in_means(x_star, y_star))
+# Replicates are drawn a chunk at a time as index matrices, and only the
+# resampled means are kept, not the x_star / y_star arrays.
+boot_stats = bootstrap_mean_diff(x, y, B=B).bootstrap_distribution
 
 boot_ci = np.quantile(boot_stats, [0.025, 0.975])
 
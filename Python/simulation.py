@@ -7,6 +7,7 @@
 import numpy as np
 from scipy.stats import norm
 from scipy.optimize import minimize
+from bootstrap import bootstrap_mean_diff
 
 ################################################
 # 1. BOOTSTRAP RESAMPLING FUNCTION
@@ -24,22 +25,14 @@ np.column_stack([bootstrap_resample(np.arange(6, 11)) for _ in range(5)])
 # 2. BOOTSTRAP TWO-SAMPLE DIFFERENCE IN MEANS
 ################################################
 
-def diff_in_means(x, y):
-    """Difference in sample means."""
-    return np.mean(x) - np.mean(y)
-
 # Example data (replace with real x, y)
 # x = np.random.normal(size=20)
 # y = np.random.normal(size=25)
 
 B = 1000
-boot_stats = []
 
-# Bootstrap loop
-for _ in range(B):
-    x_star = np.random.choice(x, size=len(x), replace=True)
-    y_star = np.random.choice(y, size=len(y), replace=True)
-    boot_stats.append(diff_in_means(x_star, y_star))
+# Bootstrap replicates as differences of resampled means, a chunk at a time
+boot_stats = bootstrap_mean_diff(x, y, B=B).bootstrap_distribution
 
 # 95% CI
 np.quantile(boot_stats, [0.025, 0.975])
@@ -0,0 +1,34 @@
+import numpy as np
+from itertools import combinations
+from permutation import permutation_test, SUM_STATISTICS
+
+
+def _brute_force_pvalue(xi, yi, statistic, alternative):
+    # Integer data give exact group sums, so ties are exact; the statistics are
+    # invariant under the affine map used to build the decimal samples.
+    Z = np.concatenate((xi, yi)).astype(np.float64)
+    n1, n2 = len(xi), len(yi)
+    idx = np.array(list(combinations(range(n1 + n2), n1)))
+    stat_func = SUM_STATISTICS[statistic]
+    total, total_sq = Z.sum(), np.dot(Z, Z)
+    stats = stat_func(Z[idx].sum(axis=1), (Z[idx] ** 2).sum(axis=1), total, total_sq, n1, n2)
+    observed = stat_func(Z[:n1].sum(), np.dot(Z[:n1], Z[:n1]), total, total_sq, n1, n2)
+    if alternative == "greater":
+        return np.mean(stats >= observed)
+    if alternative == "less":
+        return np.mean(stats <= observed)
+    return np.mean(np.abs(stats) >= abs(observed))
+
+
+def test_exact_mode_counts_ties_in_decimal_data():
+    rng = np.random.default_rng(5)
+    xi = rng.integers(0, 6, 10)
+    yi = rng.integers(0, 6, 10)
+    x, y = xi * 1.1 + 0.3, yi * 1.1 + 0.3
+    for statistic in SUM_STATISTICS:
+        for alternative in ("greater", "less", "two-sided"):
+            result = permutation_test(x, y, statistic=statistic, method="exact",
+                                      alternative=alternative, keep_distribution=False)
+            assert result.exact
+            expected = _brute_force_pvalue(xi, yi, statistic, alternative)
+            assert result.pvalue == expected, (statistic, alternative)